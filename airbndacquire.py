@@ -1,31 +1,75 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import os
 import matplotlib.pyplot as plt
-import statsmodels.api as sm
+import numpy as np
 import pandas as pd
-from statsmodels.tsa.stattools import adfuller
-from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 
 
-def timeseries_data(data, date_column):
+# Compact dtypes for the numeric columns of the NYC Airbnb 2019 listings CSV
+_AIRBNB_DTYPES = {
+    'price': 'float32',
+    'minimum_nights': 'int16',
+    'number_of_reviews': 'int16',
+    'reviews_per_month': 'float32',
+    'calculated_host_listings_count': 'int16',
+    'availability_365': 'int16',
+}
+
+
+def load_airbnb(path, date_column='last_review', usecols=None):
+    """
+    Loads the Airbnb listings CSV, parsing the date column while reading.
+    
+    Parameters:
+        path (str): The path to the listings CSV.
+        date_column (str): The column name containing the datetime values. Default is 'last_review'.
+        usecols (list): The columns to load; date_column is always included. Default is None (all columns).
+        
+    Returns:
+        data (pd.DataFrame): The raw data with compact numeric dtypes and a datetime date column.
+    """
+    if usecols is not None and date_column not in usecols:
+        usecols = [*usecols, date_column]
+    dtypes = {column: dtype for column, dtype in _AIRBNB_DTYPES.items() if usecols is None or column in usecols}
+    return pd.read_csv(path, usecols=usecols, dtype=dtypes, parse_dates=[date_column], date_format='%Y-%m-%d')
+
+
+def timeseries_data(data, date_column, arrow_dates=False):
     """
     Preprocesses time series data for analysis.
     
     Parameters:
         data (pd.DataFrame): The raw data.
         date_column (str): The column name containing the datetime values.
+        arrow_dates (bool): Store the date column as an Arrow-backed timestamp (requires pyarrow)
+            so value_counts on it runs on Arrow's compute kernels. Default is False.
         
     Returns:
         data_clean (pd.DataFrame): The preprocessed data.
     """
-    # Handling Missing Values in 'last_review'
-    data_clean = data.dropna(subset=[date_column])
+    # Convert 'last_review' to datetime data type (cache dedups repeated date strings)
+    dates = pd.to_datetime(data[date_column], format='%Y-%m-%d', cache=True, errors='coerce')
+    
+    # Handling Missing (and unparseable) Values in 'last_review'
+    has_date = dates.notna()
+    dates = dates[has_date]
+    
+    # Extract year, month, and day for further analysis in one pass over the datetime64 buffer
+    days = dates.to_numpy(dtype='datetime64[D]')
+    months = days.astype('datetime64[M]')
     
-    # Convert 'last_review' to datetime data type
-    data_clean[date_column] = pd.to_datetime(data_clean[date_column], format='%Y-%m-%d')
+    if arrow_dates:
+        dates = dates.astype('timestamp[ns][pyarrow]')
     
-    # Extract year, month, and day for further analysis
-    data_clean['year'] = data_clean[date_column].dt.year
-    data_clean['month'] = data_clean[date_column].dt.month
-    data_clean['day'] = data_clean[date_column].dt.day
+    # Build the cleaned frame with a single allocation rather than chained column assignments,
+    # storing the date parts in the narrowest integer types that hold them
+    data_clean = data[has_date].assign(**{
+        date_column: dates,
+        'year': (days.astype('datetime64[Y]').astype(np.int64) + 1970).astype(np.int16),
+        'month': (months.astype(np.int64) % 12 + 1).astype(np.int8),
+        'day': ((days - months).astype(np.int64) + 1).astype(np.int8),
+    })
     
     # Display the min and max date
     print(f"Date range: {data_clean[date_column].min()} to {data_clean[date_column].max()}")
@@ -34,6 +78,79 @@ def timeseries_data(data, date_column):
 
 
 
+# Open figures keyed by plot name and figsize, reused across calls to skip figure/canvas creation
+_figures = {}
+
+
+def _reusable_axes(name, figsize):
+    """
+    Returns a cleared figure of the given size with fresh axes, reusing the figure from the
+    previous call with the same name while it is still open.
+    
+    Parameters:
+        name (str): The plot the figure belongs to, so unrelated plots never share a figure.
+        figsize (tuple): The figure size in inches.
+        
+    Returns:
+        (Figure, Axes): The current figure and its axes.
+    """
+    key = (name, figsize)
+    fig = _figures.get(key)
+    if fig is None or not plt.fignum_exists(fig.number):
+        fig = _figures[key] = plt.figure(figsize=figsize)
+    else:
+        fig.clf()
+        plt.figure(fig.number)
+    
+    return fig, fig.add_subplot()
+
+
+def _is_sorted(values):
+    """
+    Checks in a single pass whether an array is in ascending order.
+    
+    Parameters:
+        values (np.ndarray): The values, e.g. a datetime64 array viewed as 'i8'.
+        
+    Returns:
+        is_sorted (bool): True if no value is smaller than its predecessor.
+    """
+    return not (values[1:] < values[:-1]).any()
+
+
+def _count_sorted_runs(sorted_values):
+    """
+    Counts the runs of equal values in a sorted array in a single pass.
+    
+    Parameters:
+        sorted_values (np.ndarray): The values in ascending order.
+        
+    Returns:
+        (np.ndarray, np.ndarray): The distinct values and the number of times each occurs.
+    """
+    is_run_start = np.ones(len(sorted_values), dtype=bool)
+    is_run_start[1:] = sorted_values[1:] != sorted_values[:-1]
+    run_starts = np.flatnonzero(is_run_start)
+    counts = np.diff(np.append(run_starts, len(sorted_values)))
+    return sorted_values[run_starts], counts
+
+
+def _year_range(sorted_values):
+    """
+    Reads the first and last year from sorted years or dates without reducing over them.
+    
+    Parameters:
+        sorted_values (pd.Series): The years, or datetime values, in ascending order.
+        
+    Returns:
+        (int, int): The first and last year, both NaN when there are no values.
+    """
+    if sorted_values.empty:
+        return np.nan, np.nan
+    first, last = sorted_values.iloc[0], sorted_values.iloc[-1]
+    return getattr(first, 'year', first), getattr(last, 'year', last)
+
+
 def plot_timeseries_data(data, date_column, value_column='number_of_reviews'):
     """
     Groups the data by date, plots the time series, and returns basic stats and a preview.
@@ -47,13 +164,31 @@ def plot_timeseries_data(data, date_column, value_column='number_of_reviews'):
         time_series_data (pd.DataFrame): The time series data.
         (pd.DataFrame, pd.DataFrame): Basic stats and a preview of the time series data.
     """
-    # Grouping by 'last_review' and counting the number of reviews for each date
-    time_series_data = data.groupby(date_column).size().reset_index(name=value_column)
+    # Counting the number of reviews for each date: a run-length pass when plain datetime64 dates
+    # are already in order, otherwise value_counts' hash table (Arrow's kernel for Arrow-backed
+    # dates), which avoids sorting every row; missing dates are skipped either way
+    dates = data[date_column]
+    date_values = dates.to_numpy()
+    is_datetime64 = date_values.dtype.kind == 'M'
+    if is_datetime64:
+        date_values = date_values[~np.isnat(date_values)]
+    if is_datetime64 and _is_sorted(date_values.view('i8')):
+        unique_dates, counts = _count_sorted_runs(date_values.view('i8'))
+        unique_dates = unique_dates.view(date_values.dtype)
+    else:
+        date_counts = dates.value_counts(sort=False).sort_index()
+        unique_dates, counts = date_counts.index.to_numpy(), date_counts.to_numpy()
+    
+    # The aggregate is small, so it is always returned NumPy-backed for resampling and plotting
+    time_series_data = pd.DataFrame({date_column: unique_dates, value_column: counts})
+
+    # The unique dates come out sorted, so the year range is just the first and last entries
+    first_year, last_year = _year_range(time_series_data[date_column])
 
     # Plotting the time series data
-    plt.figure(figsize=(14, 7))
+    _reusable_axes('plot_timeseries_data', (14, 7))
     plt.plot(time_series_data[date_column], time_series_data[value_column], label='Number of Reviews')
-    plt.title(f'Time Series of Airbnb Reviews in NYC ({time_series_data[date_column].min().year}-{time_series_data[date_column].max().year})')
+    plt.title(f'Time Series of Airbnb Reviews in NYC ({first_year}-{last_year})')
     plt.xlabel('Date')
     plt.ylabel('Number of Reviews')
     plt.grid(True)
@@ -65,15 +200,39 @@ def plot_timeseries_data(data, date_column, value_column='number_of_reviews'):
     return time_series_data, (time_series_data.describe(), time_series_data.head())
 
 
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
+def _fit_stl(series, seasonal_period):
+    """
+    Fits a non-robust STL with low-degree Loess smoothers to a monthly series.
+    
+    Parameters:
+        series (pd.Series): The monthly time series.
+        seasonal_period (int): The seasonal smoother length for the STL decomposition.
+        
+    Returns:
+        decomposition (DecomposeResult): The decomposed time series components.
+    """
+    # statsmodels is slow to import, so it is only loaded once a decomposition is requested
+    from statsmodels.tsa.seasonal import STL
+    from statsmodels.tsa.tsatools import freq_to_period
+    
+    # STL needs an odd trend length above the period (12 for monthly data); without a known
+    # frequency, leave the trend length to statsmodels' default
+    freq = getattr(series.index, 'freq', None)
+    trend = max(seasonal_period * 2 + 1, (freq_to_period(freq) + 1) | 1) if freq is not None else None
+    
+    # Monthly review counts are low-noise, so a degree-0 (weighted mean) seasonal smoother,
+    # linear trend/low-pass smoothers and a single inner pass without robustness weights suffice
+    stl = STL(series, seasonal=seasonal_period, trend=trend, robust=False,
+              seasonal_deg=0, trend_deg=1, low_pass_deg=1)
+    return stl.fit(inner_iter=1, outer_iter=0)
+
 
 def decompose_and_plot_timeseries(data, date_column, value_column, seasonal_period=13):
     """
     Decomposes a time series into its components and plots them.
     
     Parameters:
-        data (pd.DataFrame): The time series data.
+        data (pd.DataFrame): The aggregated time series data, e.g. the daily counts from plot_timeseries_data.
         date_column (str): The column name containing the datetime values.
         value_column (str): The column name containing the values to decompose.
         seasonal_period (int): The seasonal period for the STL decomposition. Default is 13.
@@ -81,11 +240,11 @@ def decompose_and_plot_timeseries(data, date_column, value_column, seasonal_peri
     Returns:
         decomposition (DecomposeResult): The decomposed time series components.
     """
-    # Resampling the time series data to monthly frequency
-    monthly_reviews = data.resample('M', on=date_column).sum()
+    # Resampling only the value column to monthly (month start) frequency
+    monthly_reviews = data.set_index(date_column)[value_column].resample('MS').sum()
     
     # Decomposing the time series into Trend, Seasonal, and Residual components using STL
-    decomposition = sm.tsa.STL(monthly_reviews[value_column], seasonal=seasonal_period).fit()
+    decomposition = _fit_stl(monthly_reviews, seasonal_period)
     trend = decomposition.trend
     seasonal = decomposition.seasonal
     residual = decomposition.resid
@@ -93,7 +252,7 @@ def decompose_and_plot_timeseries(data, date_column, value_column, seasonal_peri
     # Plotting the original time series and its components
     plt.figure(figsize=(14, 10))
     plt.subplot(4, 1, 1)
-    plt.plot(monthly_reviews[value_column], label='Original')
+    plt.plot(monthly_reviews, label='Original')
     plt.legend(loc='best')
     plt.title('Time Series Decomposition')
     
@@ -117,27 +276,94 @@ def decompose_and_plot_timeseries(data, date_column, value_column, seasonal_peri
     return decomposition
 
 
-def stationarity_and_acf_pacf_plots(data, value_column):
+def _decompose_chunk(groups, seasonal_period):
+    """
+    Runs STL serially over a chunk of monthly series.
+    
+    Parameters:
+        groups (list): (group, pd.Series) pairs to decompose.
+        seasonal_period (int): The seasonal period for the STL decomposition.
+        
+    Returns:
+        results (list): (group, DecomposeResult) pairs.
+    """
+    return [(group, _fit_stl(series, seasonal_period)) for group, series in groups]
+
+
+def decompose_many(data, group_col, date_column, value_column, seasonal_period=13, n_jobs=None, chunk_size=100):
+    """
+    Decomposes the monthly time series of every group (e.g. neighbourhood, room_type) in parallel.
+    
+    Parameters:
+        data (pd.DataFrame): The time series data.
+        group_col (str): The column name identifying the groups.
+        date_column (str): The column name containing the datetime values.
+        value_column (str): The column name containing the values to decompose.
+        seasonal_period (int): The seasonal period for the STL decomposition. Default is 13.
+        n_jobs (int): The number of worker processes; negative values follow joblib, so -1 uses all CPUs
+            and -2 all but one. Default is None (all CPUs).
+        chunk_size (int): The number of groups decomposed per task, to amortize task overhead. Default is 100.
+        
+    Returns:
+        decompositions (dict): The decomposed time series components keyed by group.
+    """
+    # Resampling every group to monthly frequency on a shared, gap-free month index
+    monthly = (data.groupby([group_col, pd.Grouper(key=date_column, freq='MS')], observed=True)[value_column].sum()
+               .unstack(group_col, fill_value=0)
+               .asfreq('MS', fill_value=0))
+    groups = [(group, monthly[group]) for group in monthly.columns]
+    
+    # Each task decomposes a whole chunk of groups serially to avoid oversubscription
+    chunks = [groups[i:i + chunk_size] for i in range(0, len(groups), chunk_size)]
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        results = executor.map(_decompose_chunk, chunks, repeat(seasonal_period))
+    
+    return {group: decomposition for chunk in results for group, decomposition in chunk}
+
+
+def stationarity_and_acf_pacf_plots(data, value_column, nlags=40, autolag=None):
     """
     Checks stationarity using Augmented Dickey-Fuller test and plots ACF and PACF.
     
     Parameters:
         data (pd.DataFrame): The time series data.
         value_column (str): The column name containing the values to analyze.
+        nlags (int): The number of lags to plot, capped at half the series length. Default is 40.
+        autolag (str): The ADF lag selection method, e.g. 'AIC'. Default is None (Schwert's fixed lag, one regression).
         
     Returns:
         adf_summary (pd.Series): The Augmented Dickey-Fuller test summary.
         is_stationary (bool): True if p-value <= 0.05, False otherwise.
     """
+    from statsmodels.tsa.stattools import acf, adfuller, levinson_durbin
+    
+    values = data[value_column].to_numpy(dtype=np.float64)
+    
     # Stationarity Check using Augmented Dickey-Fuller test
-    adf_result = adfuller(data[value_column])
+    # Schwert's lag, capped where statsmodels allows it for short series (nobs // 2 - 1 - ntrend)
+    maxlag = max(min(int(12 * (len(values) / 100) ** 0.25), len(values) // 2 - 2), 0)
+    adf_result = adfuller(values, maxlag=maxlag, autolag=autolag, regression='c')
     adf_summary = pd.Series(adf_result[0:4], index=['Test Statistic', 'p-value', '#Lags Used', 'Number of Observations Used'])
     
-    # Plotting ACF and PACF
+    # Computing the ACF once (FFT-based) and deriving the PACF from it via Levinson-Durbin (Yule-Walker MLE)
+    nlags = min(nlags, len(values) // 2 - 1)
+    acf_values, acf_confint = acf(values, nlags=nlags, fft=True, alpha=0.05)
+    pacf_values = levinson_durbin(acf_values, nlags=nlags, isacov=True)[2]
+    pacf_bound = 1.96 / np.sqrt(len(values))
+    
+    # Plotting ACF and PACF with their 95% confidence bands centred on zero
     fig, ax = plt.subplots(1, 2, figsize=(14, 4))
+    lags = np.arange(nlags + 1)
     
-    plot_acf(data[value_column], ax=ax[0])
-    plot_pacf(data[value_column], ax=ax[1])
+    ax[0].stem(lags, acf_values)
+    ax[0].fill_between(lags[1:], acf_confint[1:, 0] - acf_values[1:], acf_confint[1:, 1] - acf_values[1:], alpha=0.25)
+    ax[0].set_title('Autocorrelation')
+    
+    ax[1].stem(lags, pacf_values)
+    ax[1].fill_between(lags[1:], -pacf_bound, pacf_bound, alpha=0.25)
+    ax[1].set_title('Partial Autocorrelation')
     
     plt.tight_layout()
     plt.show()
@@ -146,7 +372,21 @@ def stationarity_and_acf_pacf_plots(data, value_column):
     return adf_summary, adf_result[1] <= 0.05  # True if p-value is less than 0.05
 
 
-import matplotlib.pyplot as plt
+def _growth_rate(values):
+    """
+    Computes the period-over-period percentage change of an array.
+    
+    Parameters:
+        values (np.ndarray): The values in chronological order.
+        
+    Returns:
+        growth (np.ndarray): The growth rate in percent, NaN for the first period.
+    """
+    growth = np.empty(len(values), dtype=np.float64)
+    growth[:1] = np.nan
+    growth[1:] = (values[1:] - values[:-1]) / values[:-1] * 100
+    return growth
+
 
 def plot_annual_reviews_and_growth(data, date_column, value_column_name='number_of_reviews'):
     """
@@ -160,20 +400,26 @@ def plot_annual_reviews_and_growth(data, date_column, value_column_name='number_
     Returns:
         annual_reviews (pd.DataFrame): Data containing the annual number of reviews and growth rate.
     """
-    # Extracting year from date_column
-    data['year'] = data[date_column].dt.year
+    # Counting the number of reviews per year with a histogram offset from the first year,
+    # reusing the 'year' column from timeseries_data when it is available and skipping missing dates
+    years = (data['year'] if 'year' in data.columns else data[date_column].dt.year).dropna().to_numpy(dtype=np.int64)
+    first_year = years.min() if len(years) else 0
+    annual_counts = np.bincount(years - first_year)
     
-    # Grouping by year and summing the number of reviews
-    annual_reviews = data.groupby('year').size().reset_index(name=value_column_name)
+    # Keeping only the years that have reviews, as a groupby would
+    observed = annual_counts > 0
+    annual_reviews = pd.DataFrame({'year': np.arange(first_year, first_year + len(annual_counts))[observed],
+                                   value_column_name: annual_counts[observed]})
     
     # Calculating the annual growth rate
-    annual_reviews['growth_rate'] = annual_reviews[value_column_name].pct_change() * 100
+    annual_reviews['growth_rate'] = _growth_rate(annual_reviews[value_column_name].to_numpy())
     
     # Plotting the annual reviews and growth rate
     fig, ax1 = plt.subplots(figsize=(14, 7))
 
     # Plotting number of reviews
-    ax1.set_title(f'Annual Number of Reviews and Growth Rate ({data[date_column].dt.year.min()}-{data[date_column].dt.year.max()})', fontsize=16)
+    first_year, last_year = _year_range(annual_reviews['year'])
+    ax1.set_title(f'Annual Number of Reviews and Growth Rate ({first_year}-{last_year})', fontsize=16)
     ax1.set_xlabel('Year', fontsize=14)
     ax1.set_ylabel('Number of Reviews', fontsize=14)
     ax1 = plt.plot(annual_reviews['year'], annual_reviews[value_column_name], marker='o', color='b')
@@ -196,8 +442,6 @@ def plot_annual_reviews_and_growth(data, date_column, value_column_name='number_
     return annual_reviews
 
 
-import matplotlib.pyplot as plt
-
 def plot_general_monthly_reviews(data, date_column, value_column_name='number_of_reviews'):
     """
     Plots the general monthly number of reviews (ignoring years).
@@ -210,14 +454,14 @@ def plot_general_monthly_reviews(data, date_column, value_column_name='number_of
     Returns:
         monthly_reviews_general (pd.DataFrame): Data containing the monthly number of reviews.
     """
-    # Extracting month from date_column
-    data['month'] = data[date_column].dt.month
-    
-    # Grouping by month (ignoring the year) to observe general monthly trends
-    monthly_reviews_general = data.groupby('month').size().reset_index(name=value_column_name)
+    # Counting by month (ignoring the year) to observe general monthly trends,
+    # reusing the 'month' column from timeseries_data when it is available and skipping missing dates
+    months = (data['month'] if 'month' in data.columns else data[date_column].dt.month).dropna().to_numpy(dtype=np.int64)
+    monthly_counts = np.bincount(months, minlength=13)[1:]
+    monthly_reviews_general = pd.DataFrame({'month': np.arange(1, 13), value_column_name: monthly_counts})
     
     # Plotting the monthly reviews
-    plt.figure(figsize=(14, 7))
+    _reusable_axes('plot_general_monthly_reviews', (14, 7))
     plt.bar(monthly_reviews_general['month'], monthly_reviews_general[value_column_name], color='skyblue')
     plt.title('Monthly Number of Reviews (Aggregated Over Years)', fontsize=16)
     plt.xlabel('Month', fontsize=14)
@@ -231,8 +475,6 @@ def plot_general_monthly_reviews(data, date_column, value_column_name='number_of
     return monthly_reviews_general
 
 
-import matplotlib.pyplot as plt
-
 def plot_weekday_reviews(data, date_column, value_column_name='number_of_reviews'):
     """
     Plots the number of reviews per weekday.
@@ -245,16 +487,18 @@ def plot_weekday_reviews(data, date_column, value_column_name='number_of_reviews
     Returns:
         weekday_reviews (pd.DataFrame): Data containing the number of reviews per weekday.
     """
-    # Extracting the day of the week from 'last_review' and grouping by it
-    data['weekday'] = data[date_column].dt.day_name()
-    weekday_reviews = data.groupby('weekday').size().reset_index(name=value_column_name)
+    # Counting reviews by integer day of the week (Monday=0) from 'last_review', skipping missing
+    # dates as a groupby would (1970-01-01, day 0 of datetime64[D], was a Thursday, hence the +3 offset)
+    days = data[date_column].to_numpy(dtype='datetime64[D]')
+    weekdays = (days[~np.isnat(days)].view('i8') + 3) % 7
+    weekday_counts = np.bincount(weekdays, minlength=7)
     
-    # Ordering the weekdays properly
+    # Mapping the integer weekdays to their names, already in the proper order
     weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekday_reviews = weekday_reviews.set_index('weekday').reindex(weekday_order).reset_index()
+    weekday_reviews = pd.DataFrame({'weekday': weekday_order, value_column_name: weekday_counts})
     
     # Plotting the reviews per weekday
-    plt.figure(figsize=(14, 7))
+    _reusable_axes('plot_weekday_reviews', (14, 7))
     plt.bar(weekday_reviews['weekday'], weekday_reviews[value_column_name], color='salmon')
     plt.title('Number of Reviews per Weekday (Aggregated Over Years)', fontsize=16)
     plt.xlabel('Weekday', fontsize=14)